@@ -1,30 +1,51 @@
 # app.py
 import streamlit as st
-from core import User, ExcelManager , Tournament , TournamentManager
-import json
-import hashlib
-from typing import Dict
+from core import (User, ExcelManager, Tournament, TournamentManager, read_excel, write_excel,
+                  write_snapshot, snapshot_source_version, PARQUET_SNAPSHOTS, hash_password,
+                  tournament_sheet_path, read_tournament_sheet, file_version, cached_by_version,
+                  load_users, save_users)
+from typing import Dict, Optional
 import pandas as pd
+import numpy as np
 import io
 from pathlib import Path
 import datetime
+from collections import Counter
 from PIL import Image
 
+# Must be the first Streamlit command of the script run
+st.set_page_config(
+    page_title="Poker Tournament Manager",
+    page_icon="🎰",
+    layout="wide"
+)
 
 
+
+@cached_by_version
+def _read_club_members(path: str, version: tuple) -> list:
+    """Parse the member names out of data.csv"""
+    return pd.read_csv(path, usecols=['Joueurs'])['Joueurs'].tolist()
+
 # Load player names from data.csv at the start
 def get_club_members():
     try:
-        df = pd.read_csv('data.csv')
-        return df['Joueurs'].tolist()
+        return _read_club_members('data.csv')
     except Exception as e:
         st.error(f"Error loading club members: {str(e)}")
         return []
 
+@st.cache_resource
+def _load_logo() -> Image.Image:
+    """Decode the logo once per process; a missing file raises and is retried next time"""
+    logo = Image.open("logo_bdf_blanc.png")
+    logo.load()
+    return logo
+
 def display_logo():
     """Display the logo at the top of the page"""
     try:
-        logo = Image.open("logo_bdf_blanc.png")
+        logo = _load_logo()
         # Calculate one-third of the page width
         page_width = 1000  # Typical page width in pixels
         logo_width = page_width // 6  # Divide by 6 to account for the column layout
@@ -37,85 +58,199 @@ def display_logo():
 
 
 
-def load_users() -> Dict:
-    """Load users from JSON file"""
-    with open('users.json', 'r') as f:
-        return json.load(f)
+class UsersFile:
+    """Group user edits into one write: `with UsersFile() as users:` saves once on exit"""
+    def __init__(self, users: Optional[Dict] = None):
+        self.users = users
+    
+    def __enter__(self) -> Dict:
+        if self.users is None:
+            self.users = load_users()
+        return self.users
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        # Leave users.json untouched if the block failed part-way
+        if exc_type is None:
+            save_users(self.users)
+        return False
+
+# Columns of the general ranking that are actually displayed
+RANKING_COLUMNS = ['Classement', 'Joueurs', 'Pts Classement', 'Bonus Kills',
+                   'Total des Pts', 'Moyenne', 'Nb de Kill']
+# Known text and point columns, so the readers don't have to infer them; Bonus Kills can
+# hold half points. Classement/Nb de Kill are downcast after the read since a blank cell
+# would make an integer dtype fail
+RANKING_DTYPES = {'Joueurs': 'string', 'Pts Classement': 'float32', 'Bonus Kills': 'float32',
+                  'Total des Pts': 'float32', 'Moyenne': 'float32'}
 
-def save_users(users: Dict) -> None:
-    """Save users to JSON file"""
-    with open('users.json', 'w') as f:
-        json.dump(users, f, indent=4)
+# Number formats applied by the frontend, so the ranking frame keeps numeric dtypes
+RANKING_COLUMN_CONFIG = {
+    'Classement': st.column_config.NumberColumn(format='%.0f'),
+    'Pts Classement': st.column_config.NumberColumn(format='%.1f'),
+    'Bonus Kills': st.column_config.NumberColumn(format='%.0f'),
+    'Total des Pts': st.column_config.NumberColumn(format='%.1f'),
+    'Moyenne': st.column_config.NumberColumn(format='%.2f'),
+    'Nb de Kill': st.column_config.NumberColumn(format='%.0f')
+}
+
+@cached_by_version
+def _snapshot_source(path: str, version: tuple) -> Optional[tuple]:
+    """Sheet version recorded in a snapshot's footer"""
+    return snapshot_source_version(path)
+
+def _fresh_source(path: str) -> tuple:
+    """(path, version) of the sheet's Parquet snapshot if it was made from this exact version
+    of the sheet, else of the sheet; an mtime comparison would trust a snapshot over a restored backup"""
+    version = file_version(path)
+    snapshot = Path(path).with_suffix('.parquet')
+    if PARQUET_SNAPSHOTS and snapshot.exists():
+        snapshot_version = file_version(snapshot)
+        if _snapshot_source(snapshot, snapshot_version) == version:
+            return str(snapshot), snapshot_version
+    return path, version
+
+@cached_by_version
+def _read_tournament_data(path: str, version: tuple) -> pd.DataFrame:
+    """Parse the general ranking file"""
+    if path.endswith('.parquet'):
+        # Snapshots saved from an upload keep whatever dtypes the upload had
+        df = pd.read_parquet(path, columns=RANKING_COLUMNS).astype(RANKING_DTYPES)
+    elif path.endswith('.csv'):
+        df = pd.read_csv(path, usecols=RANKING_COLUMNS, dtype=RANKING_DTYPES)
+    else:
+        df = read_excel(path, usecols=RANKING_COLUMNS, dtype=RANKING_DTYPES)
+    
+    # Narrowest dtypes that hold the values; done here so it is paid once per file version
+    for col in ['Classement', 'Nb de Kill']:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    if not path.endswith('.parquet'):
+        write_snapshot(df, path, version)
+    return df
 
 def load_tournament_data():
     """Load tournament data from Excel/CSV file"""
     try:
-        excel_manager = ExcelManager("main_data.xlsx", "tournament_data.xlsx")
-        if Path("tournament_data.xlsx").exists():
-            return pd.read_excel("tournament_data.xlsx")
-        elif Path("tournament_data.csv").exists():
-            return pd.read_csv("tournament_data.csv")
+        for path in ("tournament_data.xlsx", "tournament_data.csv"):
+            if Path(path).exists():
+                version = file_version(path)
+                # Reuse the frame this session just saved instead of parsing it back
+                preloaded = st.session_state.get('tournament_df_preloaded')
+                if preloaded is not None and preloaded[:2] == (path, version):
+                    return preloaded[2]
+                return _read_tournament_data(*_fresh_source(path))
         return None
     except Exception as e:
         st.error(f"Error loading tournament data: {str(e)}")
         return None
 
+@cached_by_version
+def _read_tournament_sheet(path: str, version: tuple) -> pd.DataFrame:
+    """Parse a tournament elimination sheet"""
+    df = read_tournament_sheet(path)
+    if path.endswith('.xlsx'):
+        # Sheet of an older tournament: the Parquet copy becomes its primary file
+        write_snapshot(df, path, version)
+    return df
+
+def load_tournament_sheet(tournament_name: str) -> pd.DataFrame:
+    """Load the elimination sheet of a tournament"""
+    path = tournament_sheet_path(tournament_name)
+    return _read_tournament_sheet(path)
+
+@st.cache_data(show_spinner=False)
+def _elimination_status(path: str, version: tuple, participants: tuple) -> tuple:
+    """Eliminated set, remaining players and killer labels for one version of a sheet"""
+    df = _read_tournament_sheet(path, version)
+    eliminated = set(df['Player'].dropna().unique())
+    remaining = [p for p in participants if p not in eliminated]
+    names = np.array(participants, dtype=str)
+    is_out = np.isin(names, list(eliminated))
+    killer_options = np.where(is_out, np.char.add(names, ' (Eliminated)'), names).tolist()
+    return eliminated, remaining, killer_options
+
+def sheet_xlsx_bytes(df: pd.DataFrame) -> bytes:
+    """Encode an elimination sheet as an XLSX download"""
+    buffer = io.BytesIO()
+    write_excel(df, buffer)
+    return buffer.getvalue()
+
+def elimination_status(tournament_name: str, participants: list) -> tuple:
+    """(eliminated_players, remaining_players, killer_options), recomputed only when the sheet changes"""
+    path = tournament_sheet_path(tournament_name)
+    return _elimination_status(str(path), file_version(path), tuple(participants))
+
+# English ordinal suffix by place (1st, 2nd, 3rd, 4th ... 11th-13th, 21st ...)
+ORDINAL_SUFFIXES = tuple(
+    'th' if 10 <= i % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(i % 10, 'th')
+    for i in range(32)
+)
+
+# Rows parsed for the upload preview; the full file is only read when the update is confirmed
+PREVIEW_ROWS = 100
+
+def read_uploaded_ranking(uploaded_file, file_extension: str, nrows: Optional[int] = None) -> pd.DataFrame:
+    """Parse an uploaded general ranking, optionally stopping after nrows"""
+    # Fresh buffer each call so repeated reads don't depend on the upload's stream position
+    data = io.BytesIO(uploaded_file.getvalue())
+    if file_extension == 'csv':
+        return pd.read_csv(data, nrows=nrows)
+    return read_excel(data, nrows=nrows)
+
+# Gold/silver/bronze, for the first three rows of a ranking
+MEDALS = ('🥇', '🥈', '🥉')
+MEDAL_STYLES = ('background-color: #FFD700', 'background-color: #C0C0C0', 'background-color: #CD7F32')
+
+def _podium_styles(df: pd.DataFrame) -> pd.DataFrame:
+    """Build the gold/silver/bronze background for the first three rows in one pass"""
+    n = len(df)
+    row_colors = np.array(MEDAL_STYLES[:n] + ('',) * max(n - len(MEDAL_STYLES), 0), dtype=object)
+    # Broadcast the per-row colour across every column
+    return pd.DataFrame(np.tile(row_colors[:, None], (1, df.shape[1])), index=df.index, columns=df.columns)
+
+@st.cache_data(show_spinner=False)
 def format_tournament_data(df):
-    """Format the tournament data display"""
+    """Format the tournament data display; memoized on the frame's content hash"""
     if df is None:
         return None
         
-    # Select and rename columns in the desired order
-    columns_mapping = {
-        'Classement': 'Classement',
-        'Joueurs': 'Joueurs',
-        'Pts Classement': 'Pts Classement',
-        'Bonus Kills': 'Bonus Kills',
-        'Total des Pts': 'Total des Pts',
-        'Moyenne': 'Moyenne',
-        'Nb de Kill': 'Nb de Kill'
-    }
-    
-    # Select only the columns we want in the specified order
-    df = df[list(columns_mapping.keys())]
+    # usecols keeps the file's column order, so this is what puts them in display order
+    df = df[RANKING_COLUMNS]
     
-    # Apply formatting
-    df = df.rename(columns=columns_mapping)
-    
-    # Format numeric columns
-    numeric_columns = ['Pts Classement', 'Bonus Kills', 'Total des Pts', 'Nb de Kill']
-    for col in numeric_columns:
-        if col in df.columns:
-            df[col] = df[col].apply(lambda x: int(x) if x == int(x) else round(x, 1))
-    
-    # Format Moyenne column separately (always show 2 decimal places)
-    if 'Moyenne' in df.columns:
-        df['Moyenne'] = df['Moyenne'].round(2)
-    
-    # Style the dataframe with specific number formatting
-    return df.style.apply(lambda x: ['background-color: #FFD700' if i == 0 
-                                   else 'background-color: #C0C0C0' if i == 1 
-                                   else 'background-color: #CD7F32' if i == 2
-                                   else '' for i in range(len(x))], axis=0)\
-                  .format({
-                      'Classement': '{:.0f}',
-                      'Pts Classement': '{:.1f}',
-                      'Bonus Kills': '{:.0f}',
-                      'Total des Pts': '{:.1f}',
-                      'Moyenne': '{:.2f}',
-                      'Nb de Kill': '{:.0f}'
-                  })
+    # Medal prefix column replaces the old gold/silver/bronze row background
+    medals = MEDALS[:len(df)]
+    df.insert(0, 'Podium', medals + ('',) * (len(df) - len(medals)))
+    return df
 
+def show_ranking(df: pd.DataFrame) -> None:
+    """Render a ranking frame the same way in every tab"""
+    st.dataframe(format_tournament_data(df), use_container_width=True, column_config=RANKING_COLUMN_CONFIG)
+
+@st.fragment
 def display_tournament_data():
     """Display tournament data in a formatted table"""
     df = load_tournament_data()
     if df is not None:
         st.markdown("### Classement actuel : ")
-        formatted_df = format_tournament_data(df)
-        st.dataframe(formatted_df, use_container_width=True)
+        show_ranking(df)
     else:
         st.warning("No tournament data available")
 
+@st.cache_resource
+def get_excel_manager() -> ExcelManager:
+    """ExcelManager shared by every session; it only holds file paths"""
+    return ExcelManager("main_data.xlsx", "tournament_data.xlsx")
+
+@st.cache_resource
+def _shared_tournament_manager() -> TournamentManager:
+    return TournamentManager()
+
+def get_tournament_manager() -> TournamentManager:
+    """TournamentManager shared by every session, so tournaments.json is parsed once per process"""
+    manager = _shared_tournament_manager()
+    # Pick up edits made to tournaments.json outside this process
+    manager.refresh()
+    return manager
+
 def init_session_state():
     """Initialize session state variables if they don't exist"""
     if 'user' not in st.session_state:
@@ -123,6 +258,11 @@ def init_session_state():
     if 'authenticated' not in st.session_state:
         st.session_state.authenticated = False
 
+def logout():
+    """Logout button callback; runs before the rerun the click triggers, so no second pass is needed"""
+    st.session_state.user = None
+    st.session_state.authenticated = False
+
 def login_page():
     """Display the login interface"""
     display_logo()
@@ -143,6 +283,14 @@ def login_page():
                 user = User(username, is_admin)
                 
                 if user.authenticate(password):
+                    if user.password_needs_rehash:
+                        # Upgrade legacy hashes while the plaintext is at hand; best-effort, the
+                        # password is already verified and the upgrade can wait for the next login
+                        try:
+                            with UsersFile(users):
+                                users[username]['password'] = hash_password(password)
+                        except OSError:
+                            pass
                     st.session_state.user = user
                     st.session_state.authenticated = True
                     st.success(f"Successfully logged in")
@@ -155,116 +303,286 @@ def login_page():
                 else:
                     st.error("Invalid credentials")
 
-def admin_view():
-    """Display the admin interface"""
-    display_logo()
-    st.title(f"Bienvenue Didier: {st.session_state.user.username}")
+def create_user_section(users: Dict) -> None:
+    """Form creating a new user; mutates and saves the users dict read by admin_view"""
+    st.markdown("### Créer un utilisateur")
+    with st.form("create_user"):
+        new_username = st.text_input("Nouvel utilisateur")
+        new_password = st.text_input("Nouveau mot de passe", type="password")
+        is_admin = st.checkbox("Privilèges Administrateur")
+        
+        submit_button = st.form_submit_button("Création Utilisateur")
+        
+        if submit_button:
+            if new_username in users:
+                st.error("Username already exists!")
+            elif not new_username or not new_password:
+                st.error("Username and password are required!")
+            else:
+                with UsersFile(users):
+                    users[new_username] = {
+                        "password": hash_password(new_password),
+                        "is_admin": is_admin,
+                        "suspended": False
+                    }
+                st.success(f"User {new_username} created successfully!")
+
+@st.fragment
+def manage_users_section() -> None:
+    """Suspend/delete editor over all users except the logged-in admin; a fragment so
+    submitting it doesn't rerun the rest of the admin page"""
+    st.markdown("### Gestion des utilisateurs existants")
+    # Read here rather than passed in, since a fragment rerun reuses its arguments
+    users = load_users()
     
-    if st.sidebar.button("Logout"):
-        st.session_state.user = None
-        st.session_state.authenticated = False
-        st.rerun()
+    # One editor for the whole list instead of three columns and two buttons per user
+    rows = [
+        (u, 'Admin' if d['is_admin'] else 'User', d.get('suspended', False), False)
+        for u, d in users.items()
+        if u != st.session_state.user.username  # Prevent self-modification
+    ]
+    users_df = pd.DataFrame.from_records(rows, columns=['Utilisateur', 'Role', 'Suspendu', 'Supprimer'])
+    # Inside a form, checkbox clicks don't rerun the script; everything is applied on submit
+    with st.form("manage_users"):
+        edited_users = st.data_editor(
+            users_df,
+            column_config={
+                'Suspendu': st.column_config.CheckboxColumn("Suspendu"),
+                'Supprimer': st.column_config.CheckboxColumn("Supprimer")
+            },
+            disabled=['Utilisateur', 'Role'],
+            hide_index=True,
+            use_container_width=True,
+            key="users_editor"
+        )
+        submitted = st.form_submit_button("Enregistrer les modifications")
     
-    st.header("Tableau de bord Administrateur")
+    # Only write users.json when a row actually changed
+    changed = edited_users[(edited_users['Suspendu'] != users_df['Suspendu']) | edited_users['Supprimer']]
+    if submitted and not changed.empty:
+        with UsersFile(users):
+            for row in changed.to_dict('records'):
+                if row['Supprimer']:
+                    del users[row['Utilisateur']]
+                else:
+                    users[row['Utilisateur']]['suspended'] = bool(row['Suspendu'])
+        # Drop the editor's pending edits so they are not replayed on the refreshed list
+        del st.session_state.users_editor
+        st.rerun(scope="fragment")
+
+@st.fragment
+def general_ranking_tab() -> None:
+    """Admin tab 2; a fragment so its widgets don't rerun the rest of the admin page"""
+    st.subheader("Gestion du classement géneral")
     
-    tab1, tab2, tab3, tab4 = st.tabs(["Gestion des utilisateurs", "Classement général ", "Gestion des tournois", "Tournois en cours"])
+    # Display current general ranking data
+    df = load_tournament_data()
+    if df is not None:
+        st.markdown("### Classement actuel")
+        show_ranking(df)
+    else:
+        st.warning("Pas de classement actuel")
     
-    with tab1:
-        st.subheader("Gestion des utilisateurs")
-        
-        # Create new user section
-        st.markdown("### Créer un utilisateur")
-        with st.form("create_user"):
-            new_username = st.text_input("Nouvel utilisateur")
-            new_password = st.text_input("Nouveau mot de passe", type="password")
-            is_admin = st.checkbox("Privilèges Administrateur")
+    # File upload section for general ranking
+    st.markdown("### Mettre à jour le classement général")
+    uploaded_file = st.file_uploader("Choisir un fichier de classement général", type=['xlsx', 'xls', 'csv'], key="general_ranking")
+    
+    if uploaded_file is not None:
+        try:
+            # Read the file based on its type
+            file_extension = uploaded_file.name.split('.')[-1].lower()
             
-            submit_button = st.form_submit_button("Création Utilisateur")
+            # Preview the uploaded data; only the first rows are parsed on each rerun
+            st.markdown("### Preview of New General Ranking Data")
+            preview_df = read_uploaded_ranking(uploaded_file, file_extension, nrows=PREVIEW_ROWS)
+            show_ranking(preview_df)
             
-            if submit_button:
-                users = load_users()
-                if new_username in users:
-                    st.error("Username already exists!")
-                elif not new_username or not new_password:
-                    st.error("Username and password are required!")
+            # Add update button
+            if st.button("Update General Ranking"):
+                # The saved ranking needs every row, so parse the whole file once here
+                df = read_uploaded_ranking(uploaded_file, file_extension)
+                if file_extension == 'xlsx':
+                    # Already a workbook: keep the uploaded bytes instead of re-encoding df
+                    get_excel_manager().save_tournament_bytes(uploaded_file.getvalue())
                 else:
-                    users[new_username] = {
-                        "password": hashlib.sha256(new_password.encode()).hexdigest(),
-                        "is_admin": is_admin,
-                        "suspended": False
-                    }
-                    save_users(users)
-                    st.success(f"User {new_username} created successfully!")
-        
-        # User management section
-        st.markdown("### Gestion des utilisateurs existants")
-        users = load_users()
+                    get_excel_manager().save_tournament_data(df)
+                get_excel_manager().save_tournament_snapshot(df[RANKING_COLUMNS])
+                _read_tournament_data.clear()
+                st.session_state.tournament_df_preloaded = (
+                    "tournament_data.xlsx", file_version("tournament_data.xlsx"), df
+                )
+                st.success("General ranking updated successfully!")
+                st.rerun()
+            
+        except Exception as e:
+            st.error(f"Error processing file: {str(e)}")
+            st.error("Please ensure your file has the required columns")
+
+@st.fragment
+def live_tournament_tab() -> None:
+    """Admin tab 4; a fragment so picking a tournament or filling the form stays local"""
+    tournament_manager = get_tournament_manager()
+    tournaments = tournament_manager.get_tournaments()
+    
+    st.subheader("Gestion du tournoi en cours")
+    
+    # Select active tournament
+    tournament_names = list(tournaments.keys())
+    
+    if tournament_names:
+        selected_tournament = st.selectbox("Choisir un tournoi ", tournament_names)
         
-        for username, user_data in users.items():
-            if username != st.session_state.user.username:  # Prevent self-modification
-                col1, col2, col3 = st.columns([2, 1, 1])
-                with col1:
-                    st.write(f"Utilisateur: {username}")
-                    st.write(f"Role: {'Admin' if user_data['is_admin'] else 'User'}")
-                    st.write(f"Status: {'Suspendu' if user_data.get('suspended', False) else 'Active'}")
+        if selected_tournament:
+            # Get tournament data
+            tournament_data = tournaments[selected_tournament]
+            
+            # Display tournament info
+            st.markdown("### Information tournois ")
+            st.write(f"Nombres de joueurs: {tournament_data['num_players']}")
+            st.write(f"Stack de départ: {tournament_data['stack_size']:,}")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("#### Participants")
+                # One markdown element for the whole list instead of one per player
+                st.markdown("\n".join(f"{i}. {p}" for i, p in enumerate(tournament_data['participants'], 1)))
+            
+            with col2:
+                st.markdown("#### Bounties")
+                if tournament_data['bounties']:
+                    st.markdown("\n".join(f"- {bounty}" for bounty in tournament_data['bounties']))
+                else:
+                    st.write("Pas de bounties pour ce tournoi ")
+            
+            # Display current tournament eliminations
+            st.markdown("### Statut du tournoi en cours")
+            df = None
+            sheet_path = tournament_sheet_path(selected_tournament)
+            if not sheet_path.exists():
+                # Skip the read entirely rather than letting the reader raise
+                st.error(f"Erreur lors de la création du tournoi: {sheet_path} introuvable")
+            else:
+                try:
+                    df = load_tournament_sheet(selected_tournament)
+                    st.dataframe(df, use_container_width=True)
+                    # The workbook is only built when the button is actually clicked
+                    st.download_button(
+                        "Exporter en Excel",
+                        data=lambda df=df: sheet_xlsx_bytes(df),
+                        file_name=f"tournament_{selected_tournament}.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    )
+                except Exception as e:
+                    st.error(f"Erreur lors de la création du tournoi: {str(e)}")
+            
+            # Form for recording eliminations
+            st.markdown("### Eliminations")
+            with st.form("elimination_form"):
+                # Get currently eliminated players, remaining players and killer labels
+                if df is not None and 'Player' in df.columns:
+                    eliminated_players, remaining_players, killer_options = elimination_status(
+                        selected_tournament, tournament_data['participants']
+                    )
+                else:
+                    eliminated_players = set()
+                    remaining_players = list(tournament_data['participants'])
+                    killer_options = list(tournament_data['participants'])
                 
-                with col2:
-                    if st.button(
-                        "Suspendre" if not user_data.get('suspended', False) else "Ré Activer",
-                        key=f"suspend_{username}"
-                    ):
-                        users[username]['suspended'] = not users[username].get('suspended', False)
-                        save_users(users)
-                        st.rerun()
+                # Only show remaining players in elimination dropdown
+                eliminated_player = st.selectbox(
+                    "Joueur éliminé",
+                    remaining_players if remaining_players else ["No players available"],
+                    key="eliminated_player"
+                )
                 
-                with col3:
-                    if st.button("Supprimer", key=f"delete_{username}"):
-                        del users[username]
-                        save_users(users)
-                        st.rerun()
+                # Create two columns for hour and minute inputs
+                time_col1, time_col2 = st.columns(2)
                 
-                st.divider()
-    
-    with tab2:
-        st.subheader("Gestion du classement géneral")
-        
-        # Display current general ranking data
-        df = load_tournament_data()
-        if df is not None:
-            st.markdown("### Classement actuel")
-            formatted_df = format_tournament_data(df)
-            st.dataframe(formatted_df, use_container_width=True)
-        else:
-            st.warning("Pas de classement actuel")
-        
-        # File upload section for general ranking
-        st.markdown("### Mettre à jour le classement général")
-        uploaded_file = st.file_uploader("Choisir un fichier de classement général", type=['xlsx', 'xls', 'csv'], key="general_ranking")
-        
-        if uploaded_file is not None:
-            try:
-                # Read the file based on its type
-                file_extension = uploaded_file.name.split('.')[-1].lower()
-                if file_extension in ['xlsx', 'xls']:
-                    df = pd.read_excel(uploaded_file)
-                elif file_extension == 'csv':
-                    df = pd.read_csv(uploaded_file)
+                # Current time as default values
+                current_time = datetime.datetime.now().time()
                 
-                # Preview the uploaded data
-                st.markdown("### Preview of New General Ranking Data")
-                formatted_preview = format_tournament_data(df)
-                st.dataframe(formatted_preview, use_container_width=True)
+                with time_col1:
+                    hour = st.number_input(
+                        "Hour",
+                        min_value=0,
+                        max_value=23,
+                        value=current_time.hour,
+                        key="elimination_hour"
+                    )
                 
-                # Add update button
-                if st.button("Update General Ranking"):
-                    excel_manager = ExcelManager("main_data.xlsx", "tournament_data.xlsx")
-                    excel_manager.save_tournament_data(df)
-                    st.success("General ranking updated successfully!")
-                    st.rerun()
+                with time_col2:
+                    minute = st.number_input(
+                        "Minute",
+                        min_value=0,
+                        max_value=59,
+                        value=current_time.minute,
+                        key="elimination_minute"
+                    )
                 
-            except Exception as e:
-                st.error(f"Error processing file: {str(e)}")
-                st.error("Please ensure your file has the required columns")
+                # Combine hour and minute into a time object
+                elimination_time = datetime.time(hour=int(hour), minute=int(minute))
+                
+                # Killer selection (from all players including eliminated)
+                killer_display = st.selectbox(
+                    "Eliminé par : ",
+                    killer_options,
+                    key="killer"
+                )
+                # Remove "(Eliminated)" suffix for database storage
+                killer = killer_display.split(" (Eliminated)")[0]
+                
+                submit_button = st.form_submit_button("Enregistrement élimination")
+                
+                if submit_button and eliminated_player != "No players available":
+                    try:
+                        tournament_manager.update_tournament_elimination(
+                            selected_tournament,
+                            eliminated_player,
+                            elimination_time.strftime("%H:%M"),
+                            killer
+                        )
+                        
+                        st.success(f"Elimination enregistré de : {eliminated_player}")
+                        # Clear the form selections
+                        if 'eliminated_player' in st.session_state:
+                            del st.session_state.eliminated_player
+                        if 'killer' in st.session_state:
+                            del st.session_state.killer
+                        st.rerun()
+                        
+                    except Exception as e:
+                        st.error(f"Error recording elimination: {str(e)}")
+                        
+            # Display remaining players count
+            st.info(f"Joueurs restants : {len(remaining_players)}")
+            
+    else:
+        st.warning("Pas de tournoi en cours. Créer un tournoi en premier lieu")
+
+# Widget keys of the tournament-creation forms, reset once a tournament is created
+TOURNAMENT_FORM_KEYS = ('member_select', 'invitee_editor', 'bounty_editor')
+
+def admin_view():
+    """Display the admin interface"""
+    display_logo()
+    st.title(f"Bienvenue Didier: {st.session_state.user.username}")
+    
+    st.sidebar.button("Logout", on_click=logout)
+    
+    st.header("Tableau de bord Administrateur")
+    # Parsed once per render for the create form; the manage fragment re-reads on its own reruns
+    users = load_users()
+    tournament_manager = get_tournament_manager()
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["Gestion des utilisateurs", "Classement général ", "Gestion des tournois", "Tournois en cours"])
+    
+    with tab1:
+        st.subheader("Gestion des utilisateurs")
+        create_user_section(users)
+        manage_users_section()
+    
+    with tab2:
+        general_ranking_tab()
     
     with tab3:
         st.subheader("Gestion d'un tournois")
@@ -314,24 +632,20 @@ def admin_view():
                 key="member_select"
             )
             
-            # Section for Invitees
+            # Section for Invitees: one editable column instead of a text_input per seat
             st.markdown("##### Invités")
-            num_invitee_rows = (num_players - len(selected_members) + 1) // 2
-            invitees = []
-            
-            # Create two columns for invitee inputs
-            for row in range(num_invitee_rows):
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    invitee1 = st.text_input("", key=f"invitee_{row}_1", placeholder="Nom de l'invité").strip()
-                    if invitee1:
-                        invitees.append(invitee1)
-                
-                with col2:
-                    invitee2 = st.text_input("", key=f"invitee_{row}_2", placeholder="Nom de l'invité").strip()
-                    if invitee2:
-                        invitees.append(invitee2)
+            num_invitees = max(num_players - len(selected_members), 0)
+            invitee_table = st.data_editor(
+                # Typed explicitly so a frame with no empty seats is still a text column
+                pd.DataFrame({"Invité": pd.Series([""] * num_invitees, dtype="string")}),
+                column_config={"Invité": st.column_config.TextColumn(help="Nom de l'invité")},
+                num_rows="dynamic",
+                hide_index=True,
+                use_container_width=True,
+                key="invitee_editor"
+            )
+            names = invitee_table["Invité"].dropna().astype(str).str.strip()
+            invitees = names[names != ""].tolist()
 
             # Combine all participants
             all_participants = selected_members + invitees
@@ -349,16 +663,16 @@ def admin_view():
                 st.markdown("#### Sélection des Bounties 🎯")
                 current_participants = st.session_state.current_participants
                 
-                # Create columns for bounty selection
-                bounty_cols = st.columns(4)
-                bounties = []
-                
-                # Display checkboxes for all current participants
-                for i, participant in enumerate(current_participants):
-                    col_idx = i % 4
-                    with bounty_cols[col_idx]:
-                        if st.checkbox(f"{participant} 🎯", key=f"bounty_{i}"):
-                            bounties.append(participant)
+                # One checkbox column for every participant
+                bounty_table = st.data_editor(
+                    pd.DataFrame({"Joueur": current_participants, "Bounty 🎯": False}),
+                    column_config={"Bounty 🎯": st.column_config.CheckboxColumn()},
+                    disabled=["Joueur"],
+                    hide_index=True,
+                    use_container_width=True,
+                    key="bounty_editor"
+                )
+                bounties = bounty_table.loc[bounty_table["Bounty 🎯"], "Joueur"].tolist()
                 
                 # Comment section
                 comment = st.text_area("Commentaire tournois", height=100)
@@ -369,15 +683,14 @@ def admin_view():
                 if submit_button:
                     if len(current_participants) != num_players:
                         st.error(f"Please enter exactly {num_players} participants (currently have {len(current_participants)})")
-                    elif len(set(current_participants)) != len(current_participants):
-                        st.error("Duplicate participants found")
+                    elif duplicate := next((p for p, n in Counter(current_participants).items() if n > 1), None):
+                        st.error(f"Duplicate participant found: {duplicate}")
                     elif not tournament_name:
                         st.error("Please enter a tournament name")
                     elif total_earnings <= 0:
                         st.error("Please enter tournament earnings")
                     else:
                         try:
-                            tournament_manager = TournamentManager()
                             tournament_manager.create_tournament(
                                 name=tournament_name,
                                 num_players=num_players,
@@ -390,164 +703,103 @@ def admin_view():
                             st.success(f"Tournoi {tournament_name} créé avec succès")
                             
                             # Clear session state after successful creation
-                            for key in list(st.session_state.keys()):
-                                if key.startswith(('member_', 'invitee_', 'bounty_')):
-                                    del st.session_state[key]
+                            for key in TOURNAMENT_FORM_KEYS:
+                                st.session_state.pop(key, None)
                             st.session_state.show_bounties = False
                             st.session_state.current_participants = []
                             st.rerun()
                                 
-                        except ValueError as e:
+                        except (ValueError, OSError) as e:
                             st.error(str(e))
 
     with tab4:
+        live_tournament_tab()
+
+@st.fragment
+def user_tournament_tab() -> None:
+    """User tab 2; a fragment so picking a tournament or refreshing it only reruns this tab"""
+    # Get available tournaments
+    tournament_manager = get_tournament_manager()
+    tournaments = tournament_manager.get_tournaments()
+    tournament_names = list(tournaments.keys())
+    
+    if tournament_names:
+        # Tournament selection
+        selected_tournament = st.selectbox(
+            "Select Tournament to View",
+            tournament_names,
+            key="user_tournament_select"
+        )
         
-        st.subheader("Gestion du tournoi en cours")
-        
-        # Select active tournament
-        tournament_manager = TournamentManager()
-        tournaments = tournament_manager.load_tournaments()
-        tournament_names = list(tournaments.keys())
-        
-        if tournament_names:
-            selected_tournament = st.selectbox("Choisir un tournoi ", tournament_names)
+        if selected_tournament:
+            # Get tournament data
+            tournament_data = tournaments[selected_tournament]
             
-            if selected_tournament:
-                # Get tournament data
-                tournament_data = tournaments[selected_tournament]
-                
-                # Display tournament info
-                st.markdown("### Information tournois ")
-                st.write(f"Nombres de joueurs: {tournament_data['num_players']}")
-                st.write(f"Stack de départ: {tournament_data['stack_size']:,}")
+            # Display tournament info in columns
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.subheader("Tournament Details")
+                st.write(f"Players: {tournament_data['num_players']}")
+                st.write(f"Starting Stack: {tournament_data['stack_size']:,}")
                 
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.markdown("#### Participants")
-                    for i, participant in enumerate(tournament_data['participants'], 1):
-                        st.write(f"{i}. {participant}")
+            with col2:
+                st.subheader("Prize Pool")
+                earnings = tournament_data.get('earnings', {})
+                if earnings:
+                    total_prize = sum(earnings.values())
+                    lines = [f"Total Prize Pool: €{total_prize:,}"]
+                    for place, amount in earnings.items():
+                        if amount > 0:
+                            # JSON round-trips the place keys as strings
+                            place = int(place)
+                            suffix = ORDINAL_SUFFIXES[place] if place < len(ORDINAL_SUFFIXES) else 'th'
+                            lines.append(f"{place}{suffix} Place: €{amount:,}")
+                    # One element for the whole breakdown; trailing double space is a line break
+                    st.markdown("  \n".join(lines))
+            
+            with col3:
+                st.subheader("Bounties")
+                if tournament_data['bounties']:
+                    # Trailing double space is a markdown line break
+                    st.markdown("  \n".join(f"🎯 {bounty}" for bounty in tournament_data['bounties']))
+                else:
+                    st.write("No bounties in this tournament")
+            
+            # Display current tournament status
+            st.subheader("Current Tournament Progress")
+            try:
+                df = load_tournament_sheet(selected_tournament)
                 
-                with col2:
-                    st.markdown("#### Bounties")
-                    if tournament_data['bounties']:
-                        for bounty in tournament_data['bounties']:
-                            st.write(f"• {bounty}")
-                    else:
-                        st.write("Pas de bounties pour ce tournoi ")
+                # Calculate remaining players
+                _, remaining_players, _ = elimination_status(
+                    selected_tournament, tournament_data['participants']
+                )
                 
-                # Display current tournament eliminations
-                st.markdown("### Statut du tournoi en cours")
-                try:
-                    df = pd.read_excel(f"tournament_{selected_tournament}.xlsx")
-                    st.dataframe(df, use_container_width=True)
-                except Exception as e:
-                    st.error(f"Erreur lors de la création du tournoi: {str(e)}")
-                    df = pd.DataFrame()  # Create empty DataFrame if file doesn't exist
+                # Display remaining players
+                st.info(f"Remaining Players ({len(remaining_players)}): {', '.join(remaining_players)}")
                 
-                # Form for recording eliminations
-                st.markdown("### Eliminations")
-                with st.form("elimination_form"):
-                    # Get currently eliminated players
-                    try:
-                        eliminated_players = set(df['Player'].dropna().values)
-                    except:
-                        eliminated_players = set()
-                    
-                    # Create list of remaining players (not yet eliminated)
-                    remaining_players = [p for p in tournament_data['participants'] 
-                                      if p not in eliminated_players]
-                    
-                    # Only show remaining players in elimination dropdown
-                    eliminated_player = st.selectbox(
-                        "Joueur éliminé",
-                        remaining_players if remaining_players else ["No players available"],
-                        key="eliminated_player"
-                    )
-                    
-                    # Create two columns for hour and minute inputs
-                    time_col1, time_col2 = st.columns(2)
-                    
-                    # Current time as default values
-                    current_time = datetime.datetime.now().time()
-                    
-                    with time_col1:
-                        hour = st.number_input(
-                            "Hour",
-                            min_value=0,
-                            max_value=23,
-                            value=current_time.hour,
-                            key="elimination_hour"
-                        )
-                    
-                    with time_col2:
-                        minute = st.number_input(
-                            "Minute",
-                            min_value=0,
-                            max_value=59,
-                            value=current_time.minute,
-                            key="elimination_minute"
-                        )
-                    
-                    # Combine hour and minute into a time object
-                    elimination_time = datetime.time(hour=int(hour), minute=int(minute))
-                    
-                    # Killer selection (from all players including eliminated)
-                    killer_options = [
-                        f"{p}{' (Eliminated)' if p in eliminated_players else ''}"
-                        for p in tournament_data['participants']
-                    ]
-                    killer_display = st.selectbox(
-                        "Eliminé par : ",
-                        killer_options,
-                        key="killer"
-                    )
-                    # Remove "(Eliminated)" suffix for database storage
-                    killer = killer_display.split(" (Eliminated)")[0]
-                    
-                    submit_button = st.form_submit_button("Enregistrement élimination")
-                    
-                    if submit_button and eliminated_player != "No players available":
-                        try:
-                            tournament_manager.update_tournament_elimination(
-                                selected_tournament,
-                                eliminated_player,
-                                elimination_time.strftime("%H:%M"),
-                                killer
-                            )
-                            
-                            # Log the elimination in tournament history
-                            tournament_manager.update_tournament_history(
-                                selected_tournament,
-                                "Elimination",
-                                f"{eliminated_player} eliminated by {killer} at {elimination_time.strftime('%H:%M')}"
-                            )
-                            
-                            st.success(f"Elimination enregistré de : {eliminated_player}")
-                            # Clear the form selections
-                            if 'eliminated_player' in st.session_state:
-                                del st.session_state.eliminated_player
-                            if 'killer' in st.session_state:
-                                del st.session_state.killer
-                            st.rerun()
-                            
-                        except Exception as e:
-                            st.error(f"Error recording elimination: {str(e)}")
-                            
-                # Display remaining players count
-                st.info(f"Joueurs restants : {len(remaining_players)}")
+                # Format and display elimination table
+                if not df.empty:
+                    # Blank cells are rendered by the Styler, so the sheet keeps its dtypes
+                    styles = _podium_styles(df)
+                    styled_df = df.style.apply(lambda _: styles, axis=None).format(na_rep='')
+                    st.dataframe(styled_df, use_container_width=True)
                 
-        else:
-            st.warning("Pas de tournoi en cours. Créer un tournoi en premier lieu")
+            except Exception as e:
+                st.error("Unable to load tournament data. The tournament might not have started yet.")
+            
+            # Refresh button; its click reruns just this fragment, which re-reads the sheet
+            st.button("Refresh Tournament Data", key="refresh_tournament")
+    else:
+        st.info("Pas de tournois en cours.")
 
 def user_view():
     """Display the regular user interface"""
     display_logo()
     st.title(f"Bienvenue : {st.session_state.user.username}")
     
-    if st.sidebar.button("Logout"):
-        st.session_state.user = None
-        st.session_state.authenticated = False
-        st.rerun()
+    st.sidebar.button("Logout", on_click=logout)
     
     # Create tabs for different views
     tab1, tab2 = st.tabs(["Classement géneral", "Tournois en cours"])
@@ -559,94 +811,14 @@ def user_view():
     with tab2:
         st.header("Information sur la bdf en cours : ")
         
-        # Get available tournaments
-        tournament_manager = TournamentManager()
-        tournaments = tournament_manager.load_tournaments()
-        tournament_names = list(tournaments.keys())
-        
-        if tournament_names:
-            # Tournament selection
-            selected_tournament = st.selectbox(
-                "Select Tournament to View",
-                tournament_names,
-                key="user_tournament_select"
-            )
-            
-            if selected_tournament:
-                # Get tournament data
-                tournament_data = tournaments[selected_tournament]
-                
-                # Display tournament info in columns
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.subheader("Tournament Details")
-                    st.write(f"Players: {tournament_data['num_players']}")
-                    st.write(f"Starting Stack: {tournament_data['stack_size']:,}")
-                    
-                with col2:
-                    st.subheader("Prize Pool")
-                    earnings = tournament_data.get('earnings', {})
-                    if earnings:
-                        total_prize = sum(earnings.values())
-                        st.write(f"Total Prize Pool: €{total_prize:,}")
-                        for place, amount in earnings.items():
-                            if amount > 0:
-                                suffix = 'st' if place == 1 else 'nd' if place == 2 else 'rd' if place == 3 else 'th'
-                                st.write(f"{place}{suffix} Place: €{amount:,}")
-                
-                with col3:
-                    st.subheader("Bounties")
-                    if tournament_data['bounties']:
-                        for bounty in tournament_data['bounties']:
-                            st.write(f"🎯 {bounty}")
-                    else:
-                        st.write("No bounties in this tournament")
-                
-                # Display current tournament status
-                st.subheader("Current Tournament Progress")
-                try:
-                    df = pd.read_excel(f"tournament_{selected_tournament}.xlsx")
-                    
-                    # Calculate remaining players
-                    eliminated_players = set(df['Player'].dropna().values)
-                    remaining_players = [p for p in tournament_data['participants'] 
-                                      if p not in eliminated_players]
-                    
-                    # Display remaining players
-                    st.info(f"Remaining Players ({len(remaining_players)}): {', '.join(remaining_players)}")
-                    
-                    # Format and display elimination table
-                    if not df.empty:
-                        df = df.fillna('')
-                        styled_df = df.style.apply(lambda x: ['background-color: #FFD700' if i == 0 
-                                                            else 'background-color: #C0C0C0' if i == 1 
-                                                            else 'background-color: #CD7F32' if i == 2
-                                                            else '' for i in range(len(x))], axis=0)
-                        st.dataframe(styled_df, use_container_width=True)
-                    
-                except Exception as e:
-                    st.error("Unable to load tournament data. The tournament might not have started yet.")
-                
-                # Add auto-refresh button
-                if st.button("Refresh Tournament Data", key="refresh_tournament"):
-                    st.rerun()
-        else:
-            st.info("Pas de tournois en cours.")
+        user_tournament_tab()
     
-    # Add general refresh button at the bottom
-    if st.button("Rafraichir les données"):
-        st.rerun()
+    # Add general refresh button at the bottom; clicking it already reruns the page
+    st.button("Rafraichir les données")
 
 def main():
     init_session_state()
     
-    st.set_page_config(
-        page_title="Poker Tournament Manager",
-        page_icon="🎰",
-        layout="wide"
-    )
-    
     if not st.session_state.authenticated:
         login_page()
     else:
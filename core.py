@@ -1,49 +1,270 @@
 # core.py
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 import streamlit as st
+import functools
 import hashlib
-import json
+import hmac
+import os
+import shutil
+import threading
+import time
+import orjson
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+# Text columns of a tournament elimination sheet; typing them up front skips inference
+# and lets names be written into rows that are still empty
+TOURNAMENT_SHEET_DTYPES = {'Player': 'string', 'Elimination Time': 'string', 'Eliminated By': 'string'}
+
+
+# Parsed or rewritten XLSX/CSV sheets get a Parquet copy next to them, so later cold reads
+# skip the spreadsheet parser; set POKER_PARQUET_SNAPSHOTS=0 to turn this off
+PARQUET_SNAPSHOTS = os.environ.get('POKER_PARQUET_SNAPSHOTS', '1') != '0'
+# Parquet metadata key holding the file_version() of the sheet a snapshot was made from
+SNAPSHOT_SOURCE_KEY = b'poker_source_version'
+
+
+def read_excel(source, **kwargs) -> pd.DataFrame:
+    """Read an Excel file with the fastest available engine"""
+    return pd.read_excel(source, engine=EXCEL_ENGINE, **kwargs)
+
+
+def write_excel(df: pd.DataFrame, path) -> None:
+    """Write df as a single-sheet XLSX to a path or buffer, streaming rows when xlsxwriter is available"""
+    if xlsxwriter is None:
+        df.to_excel(path, index=False)
+        return
+    # constant_memory flushes each row as soon as the next one starts, so rows must be
+    # written in order; pandas' own xlsxwriter path goes column by column and loses cells
+    rows = df.astype(object).where(df.notna(), None)
+    target = path if hasattr(path, 'write') else str(path)  # a path or a binary buffer
+    # Same date format as pandas' own writer, or datetimes come out as bare serial numbers
+    options = {'constant_memory': True, 'default_date_format': 'yyyy-mm-dd hh:mm:ss'}
+    with xlsxwriter.Workbook(target, options) as workbook:
+        sheet = workbook.add_worksheet()
+        sheet.write_row(0, 0, [str(col) for col in df.columns])
+        for r, row in enumerate(rows.itertuples(index=False, name=None), start=1):
+            sheet.write_row(r, 0, row)
+
+
+def file_version(path) -> tuple:
+    """(mtime_ns, size) of a file; the size catches rewrites within one mtime tick"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def cached_by_version(read: Callable) -> Callable:
+    """Decorator caching read(path, version) until file_version(path) changes; call the result
+    with a path, plus the version when the caller already has it. .clear() drops the cache"""
+    # wraps() also gives the cached function the reader's name and source, which is what
+    # Streamlit keys a cache on; without it every reader would share one cache
+    @st.cache_data(show_spinner=False)
+    @functools.wraps(read)
+    def read_version(path: str, version: tuple):
+        return read(path, version)
+    
+    @functools.wraps(read)
+    def load(path, version: Optional[tuple] = None):
+        return read_version(str(path), version or file_version(path))
+    load.clear = read_version.clear
+    return load
+
+
+@cached_by_version
+def _read_excel_cached(path: str, version: tuple) -> pd.DataFrame:
+    """Parse a workbook"""
+    return read_excel(path)
+
+
+def tournament_sheet_path(tournament_name: str) -> Path:
+    """Elimination sheet of a tournament: Parquet, or the XLSX of a tournament created before that"""
+    path = Path(f"tournament_{tournament_name}.parquet")
+    legacy = path.with_suffix('.xlsx')
+    return legacy if not path.exists() and legacy.exists() else path
+
+
+def read_tournament_sheet(path) -> pd.DataFrame:
+    """Read an elimination sheet in either of its formats"""
+    path = Path(path)
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path)
+    return read_excel(path, dtype=TOURNAMENT_SHEET_DTYPES)
+
+
+def _replace_file(path, write) -> None:
+    """Call write(tmp_path), then swap the finished file in so readers never see a half-written one"""
+    path = Path(path)
+    # Per-thread name, since sessions can write the same file at once
+    tmp_file = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    write(tmp_file)
+    os.replace(tmp_file, path)
+
+
+def write_tournament_sheet(df: pd.DataFrame, tournament_name: str) -> None:
+    """Save an elimination sheet as Parquet; XLSX is only produced on export"""
+    _replace_file(
+        f"tournament_{tournament_name}.parquet",
+        lambda tmp: df.to_parquet(tmp, engine='pyarrow', compression='snappy', index=False)
+    )
+
+
+def write_snapshot(df: pd.DataFrame, path, version: Optional[tuple] = None) -> None:
+    """Best-effort Parquet copy of a sheet, written next to it and tagged with the sheet's
+    version (default: its current one)"""
+    if not PARQUET_SNAPSHOTS or pa is None:
+        return
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        source = orjson.dumps(list(version or file_version(path)))
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), SNAPSHOT_SOURCE_KEY: source})
+        _replace_file(Path(path).with_suffix('.parquet'), lambda tmp: pq.write_table(table, tmp))
+    except (OSError, pa.ArrowException):
+        # Read-only directory, or a column Arrow can't type (e.g. numbers mixed with '-'):
+        # the sheet itself stays the only source
+        pass
+
+
+def snapshot_source_version(snapshot) -> Optional[tuple]:
+    """file_version() of the sheet a snapshot was written from; None if it wasn't recorded"""
+    if pq is None:
+        return None
+    source = (pq.read_schema(snapshot).metadata or {}).get(SNAPSHOT_SOURCE_KEY)
+    return tuple(orjson.loads(source)) if source else None
+
+
+# Lanes per Argon2 hash. Stored in every hash, so it must not follow the host's core count:
+# check_needs_rehash would then rewrite every hash after a move to a different machine
+ARGON2_PARALLELISM = 4
+
+
+@st.cache_resource
+def get_password_hasher() -> PasswordHasher:
+    """Shared Argon2 hasher; the native lib spreads each hash over ARGON2_PARALLELISM threads"""
+    return PasswordHasher(time_cost=2, memory_cost=65536, parallelism=ARGON2_PARALLELISM)
+
+
+def hash_password(password: str) -> str:
+    """Salted Argon2 hash of a password"""
+    return get_password_hasher().hash(password)
+
+
+def verify_password(stored: str, password: str) -> bool:
+    """Check a password against an Argon2 hash, or a legacy hex SHA-256 one"""
+    if not stored.startswith('$argon2'):
+        return hmac.compare_digest(stored, hashlib.sha256(password.encode()).hexdigest())
+    try:
+        return get_password_hasher().verify(stored, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def password_needs_rehash(stored: str) -> bool:
+    """True for legacy SHA-256 hashes and Argon2 hashes made with older parameters"""
+    return not stored.startswith('$argon2') or get_password_hasher().check_needs_rehash(stored)
+
+
+@cached_by_version
+def _read_users(path: str, version: tuple) -> Dict:
+    """Parse users.json"""
+    return orjson.loads(Path(path).read_bytes())
+
+
+def load_users() -> Dict:
+    """Load users from JSON file"""
+    return _read_users('users.json')
+
+
+def save_users(users: Dict) -> None:
+    """Save users to JSON file"""
+    data = orjson.dumps(users, option=orjson.OPT_INDENT_2)
+    _replace_file('users.json', lambda tmp: tmp.write_bytes(data))
+    _read_users.clear()
+
 
 class User:
     def __init__(self, username: str, is_admin: bool = False):
         self.username = username
         self.is_admin = is_admin
         self.is_authenticated = False
+        # Set by authenticate() when the stored hash should be replaced by a fresh one
+        self.password_needs_rehash = False
     
     def authenticate(self, password: str) -> bool:
-        # Simple password hashing - in production use proper password hashing
-        users = json.load(open('users.json'))
-        hashed_password = hashlib.sha256(password.encode()).hexdigest()
-        if (self.username in users and 
-            users[self.username]['password'] == hashed_password and 
+        users = load_users()
+        # Unknown names are rejected before paying for a hash
+        if self.username not in users:
+            return False
+        if (verify_password(users[self.username]['password'], password) and 
             users[self.username]['is_admin'] == self.is_admin):
             self.is_authenticated = True
+            self.password_needs_rehash = password_needs_rehash(users[self.username]['password'])
             return True
         return False
 
+# Backups requested within this many seconds of the previous one are skipped
+BACKUP_WINDOW_SECONDS = 1.0
+
 class ExcelManager:
     def __init__(self, main_file: str, tournament_file: str):
         self.main_file = Path(main_file)
         self.tournament_file = Path(tournament_file)
+        self._last_backup = None
         
     def load_main_data(self) -> pd.DataFrame:
-        return pd.read_excel(self.main_file)
+        return _read_excel_cached(self.main_file)
     
     def load_tournament_data(self) -> pd.DataFrame:
-        return pd.read_excel(self.tournament_file)
+        return _read_excel_cached(self.tournament_file)
     
     def save_main_data(self, df: pd.DataFrame) -> None:
         self.backup_files()
-        df.to_excel(self.main_file, index=False)
+        write_excel(df, self.main_file)
+        _read_excel_cached.clear()
     
     def save_tournament_data(self, df: pd.DataFrame) -> None:
         self.backup_files()
-        df.to_excel(self.tournament_file, index=False)
+        write_excel(df, self.tournament_file)
+        _read_excel_cached.clear()
+    
+    def save_tournament_snapshot(self, df: pd.DataFrame) -> None:
+        """Columnar copy of the saved tournament sheet; readers only trust it until the XLSX changes"""
+        write_snapshot(df, self.tournament_file)
+    
+    def save_tournament_bytes(self, data: bytes) -> None:
+        """Store an uploaded workbook as-is, skipping the DataFrame -> XLSX re-encode"""
+        self.backup_files()
+        self.tournament_file.write_bytes(data)
+        _read_excel_cached.clear()
     
     def backup_files(self) -> None:
+        # Saves in quick succession (e.g. main + tournament data) share one backup
+        now = time.monotonic()
+        if self._last_backup is not None and now - self._last_backup < BACKUP_WINDOW_SECONDS:
+            return
+        self._last_backup = now
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_dir = Path("backups")
         backup_dir.mkdir(exist_ok=True)
@@ -51,7 +272,8 @@ class ExcelManager:
         for file in [self.main_file, self.tournament_file]:
             if file.exists():
                 backup_name = backup_dir / f"{file.stem}_{timestamp}{file.suffix}"
-                pd.read_excel(file).to_excel(backup_name, index=False)
+                # Byte copy: no re-parse, and formatting/formulas survive
+                shutil.copy2(file, backup_name)
 class Tournament:
     def __init__(self, name: str, num_players: int, participants: list, bounties: list, 
                  stack_size: int, comment: str):
@@ -86,136 +308,177 @@ class Tournament:
 class TournamentManager:
     def __init__(self, tournaments_file: str = 'tournaments.json'):
         self.tournaments_file = Path(tournaments_file)
+        # One manager is shared by every session thread; held over each refresh -> edit -> save
+        # sequence so concurrent admins can't lose each other's updates. Reentrant because the
+        # public methods call each other
+        self._lock = threading.RLock()
+        self._loaded_version = self._file_version()
         self.tournaments = self.load_tournaments()
     
+    def _file_version(self) -> Optional[tuple]:
+        return file_version(self.tournaments_file) if self.tournaments_file.exists() else None
+    
+    def refresh(self) -> None:
+        """Reload tournaments if the JSON file changed since this manager last read or wrote it"""
+        with self._lock:
+            version = self._file_version()
+            if version != self._loaded_version:
+                self._loaded_version = version
+                self.tournaments = self.load_tournaments()
+    
     def load_tournaments(self) -> Dict:
         """Load tournaments from JSON file"""
         if self.tournaments_file.exists():
             try:
-                with open(self.tournaments_file, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
+                return orjson.loads(self.tournaments_file.read_bytes())
+            except orjson.JSONDecodeError:
                 return {}
         return {}
     
     def save_tournaments(self) -> None:
-        """Save tournaments to JSON file"""
-        with open(self.tournaments_file, 'w') as f:
-            json.dump(self.tournaments, f, indent=4)
+        """Save tournaments to JSON file; a failed write is raised to the caller"""
+        with self._lock:
+            # Earnings are keyed by int place; NON_STR_KEYS writes them as "1", "2"... like json did
+            data = orjson.dumps(self.tournaments, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            try:
+                _replace_file(self.tournaments_file, lambda tmp: tmp.write_bytes(data))
+            except OSError:
+                # Drop the edits that never reached the disk instead of saving them by accident later
+                self._loaded_version = self._file_version()
+                self.tournaments = self.load_tournaments()
+                raise
+            self._loaded_version = self._file_version()
     
     def get_tournaments(self) -> Dict:
-        """Get all tournaments"""
-        return self.tournaments
+        """Get all tournaments; a copy, so callers can iterate while another session adds one"""
+        with self._lock:
+            return dict(self.tournaments)
     
     def get_tournament(self, name: str) -> Optional[Dict]:
         """Get specific tournament by name"""
         return self.tournaments.get(name)
     
-    def create_tournament_excel(self, tournament_name: str, num_players: int) -> None:
-        """Create initial tournament Excel file with required columns"""
-        df = pd.DataFrame(columns=['Rank', 'Player', 'Elimination Time', 'Eliminated By'])
-        df['Rank'] = range(num_players, 0, -1)  # Reverse order for eliminations
-        excel_path = f"tournament_{tournament_name}.xlsx"
-        df.to_excel(excel_path, index=False)
+    def create_tournament_table(self, tournament_name: str, num_players: int) -> None:
+        """Create the initial tournament sheet with required columns"""
+        # Typed up front so recorded names land in string columns, not all-NaN object ones
+        empty_text = pd.Series(pd.NA, index=range(num_players), dtype='string')
+        df = pd.DataFrame({
+            'Rank': np.arange(num_players, 0, -1, dtype=np.int32),  # Reverse order for eliminations
+            'Player': empty_text,
+            'Elimination Time': empty_text,
+            'Eliminated By': empty_text,
+            'Bounty Points': pd.Series(0, index=range(num_players), dtype='int8')
+        })
+        write_tournament_sheet(df, tournament_name)
     
     def create_tournament(self, name: str, num_players: int, participants: list, 
                          bounties: list, stack_size: int, comment: str, earnings: dict) -> None:
         """Create a new tournament"""
-        if name in self.tournaments:
-            raise ValueError(f"Tournament {name} already exists")
+        with self._lock:
+            self.refresh()
+            if name in self.tournaments:
+                raise ValueError(f"Tournament {name} already exists")
         
-        tournament_data = {
-            'name': name,
-            'num_players': num_players,
-            'participants': participants,
-            'bounties': bounties,
-            'stack_size': stack_size,
-            'comment': comment,
-            'earnings': earnings,  # Add earnings to tournament data
-            'date_created': datetime.now().isoformat(),
-            'history': []
-        }
+            tournament_data = {
+                'name': name,
+                'num_players': num_players,
+                'participants': participants,
+                'bounties': bounties,
+                'stack_size': stack_size,
+                'comment': comment,
+                'earnings': earnings,  # Add earnings to tournament data
+                'date_created': datetime.now().isoformat(),
+                'next_empty_row': 0,  # Sheet rows fill strictly in order
+                'history': []
+            }
         
-        self.tournaments[name] = tournament_data
-        self.save_tournaments()
+            self.tournaments[name] = tournament_data
+            self.save_tournaments()
         
-        # Create initial tournament Excel file
-        self.create_tournament_excel(name, num_players)
+            # Create initial tournament sheet
+            self.create_tournament_table(name, num_players)
     
-    def update_tournament_history(self, name: str, action: str, details: str) -> None:
-        """Update tournament history"""
-        if name not in self.tournaments:
-            raise ValueError(f"Tournament {name} not found")
+    def update_tournament_history(self, name: str, action: str, details: str, save: bool = True) -> None:
+        """Update tournament history; save=False leaves the write to the caller, to batch entries"""
+        with self._lock:
+            if name not in self.tournaments:
+                raise ValueError(f"Tournament {name} not found")
             
-        if 'history' not in self.tournaments[name]:
-            self.tournaments[name]['history'] = []
+            if 'history' not in self.tournaments[name]:
+                self.tournaments[name]['history'] = []
             
-        self.tournaments[name]['history'].append({
-            'timestamp': datetime.now().isoformat(),
-            'action': action,
-            'details': details
-        })
-        self.save_tournaments()
+            self.tournaments[name]['history'].append({
+                'timestamp': datetime.now().isoformat(),
+                'action': action,
+                'details': details
+            })
+            if save:
+                self.save_tournaments()
     
     def update_tournament_elimination(self, tournament_name: str, player: str, 
                                 elimination_time: str, eliminated_by: str) -> None:
-        """Update tournament Excel with elimination information"""
-        excel_path = f"tournament_{tournament_name}.xlsx"
+        """Update the tournament sheet with elimination information"""
         
-        try:
-            # Load tournament data to check bounties and participants
-            tournaments = self.load_tournaments()
-            tournament_data = tournaments[tournament_name]
-            bounties = tournament_data.get('bounties', [])
-            all_participants = tournament_data.get('participants', [])
+        with self._lock:
+            try:
+                # In-memory tournaments, reloaded only if the JSON changed on disk (one stat call)
+                self.refresh()
+                tournament_data = self.tournaments[tournament_name]
+                bounties = tournament_data.get('bounties', [])
+                all_participants = tournament_data.get('participants', [])
             
-            df = pd.read_excel(excel_path)
+                df = read_tournament_sheet(tournament_sheet_path(tournament_name))
             
-            # Find the first empty row (based on Player column) and update it
-            empty_row = df['Player'].isna()
-            if empty_row.any():
-                idx = empty_row.idxmax()
-                df.loc[idx, 'Player'] = player
-                df.loc[idx, 'Elimination Time'] = elimination_time
-                df.loc[idx, 'Eliminated By'] = eliminated_by
+                # The stored cursor is normally the first empty row; older tournaments have none
+                # and a hand-edited sheet may disagree, so fall back to finding it
+                idx = tournament_data.get('next_empty_row')
+                if (idx is None or idx >= len(df) or not pd.isna(df.at[idx, 'Player'])
+                        or (idx > 0 and pd.isna(df.at[idx - 1, 'Player']))):
+                    empty_row = df['Player'].isna()
+                    idx = empty_row.idxmax() if empty_row.any() else None
+                if idx is not None:
+                    df.loc[idx, 'Player'] = player
+                    df.loc[idx, 'Elimination Time'] = elimination_time
+                    df.loc[idx, 'Eliminated By'] = eliminated_by
+                
+                    # History entries of this elimination, recorded once the sheet is written
+                    entries = [("Elimination", f"{player} eliminated by {eliminated_by} at {elimination_time}")]
                 
-                # If the eliminated player had a bounty, award point to the eliminator
-                bounty_points = 1 if player in bounties else 0
-                df.loc[idx, 'Bounty Points'] = bounty_points
+                    # If the eliminated player had a bounty, award point to the eliminator
+                    bounty_points = 1 if player in bounties else 0
+                    df.loc[idx, 'Bounty Points'] = bounty_points
                 
-                if bounty_points > 0:
-                    # Update tournament history with bounty claim
-                    self.update_tournament_history(
-                        tournament_name,
-                        "Bounty Claimed",
-                        f"{eliminated_by} claimed bounty point for eliminating {player}"
-                    )
+                    if bounty_points > 0:
+                        # Update tournament history with bounty claim
+                        entries.append(("Bounty Claimed", f"{eliminated_by} claimed bounty point for eliminating {player}"))
                 
-                # Check if there's only one player left
-                recorded_players = set(df['Player'].dropna().values)
-                remaining_players = [p for p in all_participants if p not in recorded_players]
+                    # Check if there's only one player left
+                    recorded_players = set(df['Player'].dropna().values)
+                    remaining_players = [p for p in all_participants if p not in recorded_players]
                 
-                # If there's exactly one player remaining, they're the winner
-                if len(remaining_players) == 1:
-                    winner = remaining_players[0]
-                    # Find the last empty row
-                    last_empty_idx = empty_row[empty_row].index[-1]
-                    # Add the winner
-                    df.loc[last_empty_idx, 'Player'] = winner
-                    df.loc[last_empty_idx, 'Elimination Time'] = elimination_time  # Same time as last elimination
-                    df.loc[last_empty_idx, 'Eliminated By'] = "WINNER"  # Mark as winner
+                    # If there's exactly one player remaining, they're the winner
+                    if len(remaining_players) == 1:
+                        winner = remaining_players[0]
+                        # Find the last empty row
+                        empty_row = df['Player'].isna()
+                        last_empty_idx = empty_row[empty_row].index[-1]
+                        # Add the winner
+                        df.loc[last_empty_idx, 'Player'] = winner
+                        df.loc[last_empty_idx, 'Elimination Time'] = elimination_time  # Same time as last elimination
+                        df.loc[last_empty_idx, 'Eliminated By'] = "WINNER"  # Mark as winner
                     
-                    # Update tournament history
-                    self.update_tournament_history(
-                        tournament_name,
-                        "Winner Declared",
-                        f"{winner} wins the tournament!"
-                    )
+                        # Update tournament history
+                        entries.append(("Winner Declared", f"{winner} wins the tournament!"))
                 
-                # Save updates
-                df.to_excel(excel_path, index=False)
-            else:
-                raise ValueError("No empty slots available for elimination")
+                    # Save updates; an XLSX sheet from an older tournament is migrated here. The
+                    # cursor and history only change after the sheet write, so a failed one leaves no trace
+                    write_tournament_sheet(df, tournament_name)
+                    tournament_data['next_empty_row'] = int(idx) + 1
+                    for action, details in entries:
+                        self.update_tournament_history(tournament_name, action, details, save=False)
+                    self.save_tournaments()
+                else:
+                    raise ValueError("No empty slots available for elimination")
                 
-        except Exception as e:
-            raise Exception(f"Error updating tournament elimination: {str(e)}")
\ No newline at end of file
+            except Exception as e:
+                raise Exception(f"Error updating tournament elimination: {str(e)}")
\ No newline at end of file